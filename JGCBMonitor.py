@@ -15,13 +15,29 @@ The purpose of this application is to:
 
 import sys
 import time
+import json
+import socket
 import syslog
+import threading
 
 import paho.mqtt.client as mqtt
 
+# msgpack payloads are about half the bytes of JSON on this data and
+# orjson serializes a few times faster than the stdlib, fall back down
+# the chain when they are not installed on the Pi
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 from datetime import datetime
 
-from collections import deque
+from dataclasses import dataclass, asdict
 
 from bacpypes.debugging import bacpypes_debugging, ModuleLogger
 from bacpypes.consolelogging import ConfigArgumentParser
@@ -33,7 +49,8 @@ from bacpypes.task import RecurringTask
 from bacpypes.pdu import Address
 from bacpypes.object import get_datatype
 
-from bacpypes.apdu import ReadPropertyRequest, ReadPropertyACK
+from bacpypes.apdu import ReadPropertyMultipleRequest, ReadPropertyMultipleACK, \
+    ReadAccessSpecification, PropertyReference
 from bacpypes.primitivedata import Unsigned, ObjectIdentifier
 from bacpypes.constructeddata import Array
 
@@ -43,16 +60,168 @@ from bacpypes.local.device import LocalDeviceObject
 from misty.mstplib import MSTPSimpleApplication
 
 from JGCBMonitor_config import mqtt_broker_address, mqtt_broker_port, mqtt_JGCB_topics, mqtt_keep_alive_time
-from JGCBMonitor_config import mqtt_first_reconnect_delay, mqtt_reconnect_rate, mqtt_max_reconnect_delay
-from JGCBMonitor_config import JGCB_mqtt_ID, JGCB_interval
-from JGCBMonitor_config import GS4_point_list
+from JGCBMonitor_config import mqtt_first_reconnect_delay, mqtt_max_reconnect_delay
+from JGCBMonitor_config import JGCB_mqtt_ID
+from JGCBMonitor_config import GS4_point_list, GS4_fire_and_forget
+from JGCBMonitor_config import GS4_fast_point_list, GS4_slow_point_list
+from JGCBMonitor_config import GS4_fast_interval, GS4_slow_interval
 
 # some debugging
 _debug = 0
 _log = ModuleLogger(globals())
 
+# no-op debug binding for the hot path, main() rebinds this to
+# PrairieDog._debug once debugging is enabled so each disabled call
+# site costs a single C-level call with no attribute lookup
+def _dbg(*args):
+    pass
+
 # globals
-mqtt_connected = False
+# broker connection state, set/cleared from paho's network thread and
+# read from the bacpypes task without any global lookups
+_mqtt_connected = threading.Event()
+
+# monotonic timestamp of the last broker disconnect, None while
+# connected, checked from the recurring task for the LoRa fallback
+mqtt_disconnect_time = None
+
+#
+#   GS4 point metadata, resolved once at import
+#
+#   GS4_point_list is static, so resolve the object identifiers, group the
+#   points by device, and look up the datatypes here instead of repeating
+#   that work on every polling tick.
+#
+
+GS4_device_points = {}
+GS4_point_keys = []
+for point_addr, point_obj_id, point_prop_id in GS4_point_list:
+    point_obj_id = ObjectIdentifier(point_obj_id).value
+    GS4_device_points.setdefault(point_addr, {}).setdefault(point_obj_id, []).append(point_prop_id)
+    GS4_point_keys.append((point_addr, point_obj_id, point_prop_id))
+
+GS4_datatypes = {}
+for device_objects in GS4_device_points.values():
+    for point_obj_id, point_prop_ids in device_objects.items():
+        for point_prop_id in point_prop_ids:
+            point_datatype = get_datatype(point_obj_id[0], point_prop_id)
+            if not point_datatype:
+                raise ValueError("invalid property for object type: %s %s" % (point_obj_id, point_prop_id))
+            GS4_datatypes[(point_obj_id[0], point_prop_id)] = point_datatype
+
+# cache Address objects so the MAC parse happens once per destination
+GS4_addresses = {}
+
+def _encode(value):
+    # coerce bacpypes primitives into plain JSON-friendly types so the
+    # payload schema is deterministic instead of whatever __repr__ gives
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return value
+    if isinstance(value, (list, tuple)):
+        return [_encode(element) for element in value]
+    if hasattr(value, 'value'):
+        # Atomic primitives, enumerations, bit strings
+        return _encode(value.value)
+    return str(value)
+
+# pick the payload encoding once, subscribers learn it from the
+# retained <topic>/encoding message published on connect
+if msgpack is not None:
+    payload_encoding = "msgpack"
+    def _dumps(obj):
+        return msgpack.packb(obj, use_bin_type=True)
+elif orjson is not None:
+    payload_encoding = "json"
+    def _dumps(obj):
+        return orjson.dumps(obj)
+else:
+    payload_encoding = "json"
+    def _dumps(obj):
+        return json.dumps(obj, default=str)
+
+def GS4_address(addr):
+    # return the interned Address for addr, parsing it at most once
+    address = GS4_addresses.get(addr)
+    if address is None:
+        address = GS4_addresses[addr] = Address(addr)
+    return address
+
+def _prepare_requests(point_list):
+    # prebuild one ReadPropertyMultiple request per device, the contents
+    # never change for a static point list so only the IOCB wrapper is
+    # allocated per polling cycle; each entry carries the point keys the
+    # request covers so errors and resets stay correlated
+    device_points = {}
+    for addr, obj_id, prop_id in point_list:
+        obj_id = ObjectIdentifier(obj_id).value
+        device_points.setdefault(addr, {}).setdefault(obj_id, []).append(prop_id)
+
+    requests = []
+    for addr, objects in device_points.items():
+        read_access_specs = []
+        device_keys = []
+        for obj_id, prop_ids in objects.items():
+            read_access_specs.append(
+                ReadAccessSpecification(
+                    objectIdentifier=obj_id,
+                    listOfPropertyReferences=[
+                        PropertyReference(propertyIdentifier=prop_id)
+                        for prop_id in prop_ids
+                        ],
+                    )
+                )
+            device_keys.extend((addr, obj_id, prop_id) for prop_id in prop_ids)
+
+        request = ReadPropertyMultipleRequest(listOfReadAccessSpecs=read_access_specs)
+        request.pduDestination = GS4_address(addr)
+        requests.append((addr, tuple(device_keys), request))
+    return tuple(requests)
+
+# live values are polled every cycle, nameplate fields only when stale
+GS4_fast_requests = _prepare_requests(GS4_fast_point_list)
+GS4_slow_requests = _prepare_requests(GS4_slow_point_list)
+GS4_all_requests = GS4_fast_requests + GS4_slow_requests
+
+# frozen, per-cycle iteration is an integer index into these tuples
+GS4_point_keys = tuple(GS4_point_keys)
+
+# slot index per point for the preallocated response buffer
+GS4_point_index = {point_key: i for i, point_key in enumerate(GS4_point_keys)}
+
+#
+#   MSTP device arguments, validated once from the ini
+#
+
+@dataclass(slots=True)
+class MSTPArgs:
+    address: int
+    interface: str
+    max_masters: int
+    baudrate: int
+    maxinfo: int
+    mstpdbgfile: str | None = None
+
+    @classmethod
+    def from_ini(cls, ini):
+        return cls(
+            address=int(ini.address),
+            interface=str(ini.interface),
+            max_masters=int(ini.max_masters),
+            baudrate=int(ini.baudrate),
+            maxinfo=int(ini.maxinfo),
+            mstpdbgfile=str(ini.mstpdbgfile) if hasattr(ini, 'mstpdbgfile') else None,
+            )
+
+    def device_kwargs(self):
+        # underscore-prefixed kwargs for LocalDeviceObject, leaving out
+        # the debug file when it is not configured
+        return {'_' + name: value for name, value in asdict(self).items()
+                if value is not None}
+
+# busy bits, one per monitored subsystem
+GS4_BIT = 1
+ARDUINO1_BIT = 2
+PI_BIT = 4
 
 #
 #  Recurring Task to Monitor GS4 Drive System
@@ -61,243 +230,348 @@ mqtt_connected = False
 
 @bacpypes_debugging
 class PrairieDog(MSTPSimpleApplication, RecurringTask):
-    
-    def __init__(self, interval, client, *args):
-        if _debug: PrairieDog._debug("__init__ %r %r", interval, args)
+
+    # the monitor's own attribute set is fixed, slot descriptors keep
+    # the hot callback path off the instance dict (the bacpypes parents
+    # still provide __dict__ for their own state)
+    __slots__ = (
+        '_busy_mask', 'missed_ticks', '_debug_buf', 'mqtt_client',
+        'fire_and_forget', 'interval', 'max_inflight',
+        '_cycle', '_pending', '_submit_index', 'response_values',
+        '_topic_offsets', '_last_publish_ok', 'mqtt_connected',
+        '_cycle_requests', '_last_slow_poll',
+        )
+
+    def __init__(self, interval, client, *args, fire_and_forget=GS4_fire_and_forget,
+                 max_inflight=1, mqtt_connected=_mqtt_connected):
+        _dbg("__init__ %r %r", interval, args)
         MSTPSimpleApplication.__init__(self, *args)
         # set interval of recurring task (in seconds)
         RecurringTask.__init__(self, interval * 1000)
 
-        # initialize to not busy
-        self.GS4_busy = False
-        self.arduino1_busy = False
+        # one busy bit per subsystem, count the ticks that land while a
+        # cycle is still running instead of silently eating them
+        self._busy_mask = 0
+        self.missed_ticks = 0
+
+        # per-point debug output is buffered and written once per cycle
+        self._debug_buf = []
+
+        # preallocated response buffer, one slot per point, written by
+        # index so responses can never misalign with the point list
+        self.response_values = [None] * len(GS4_point_keys)
+
         self.mqtt_client = client
+        self.mqtt_connected = mqtt_connected
+
+        self.fire_and_forget = fire_and_forget
+
+        # each topic owns four consecutive points, pair them up once
+        self._topic_offsets = list(zip(mqtt_JGCB_topics, range(0, len(GS4_point_list), 4)))
+
+        # when the last publish reached a live broker, used to stop
+        # doing payload work during a long outage
+        self._last_publish_ok = time.monotonic()
+        self.interval = interval
+
+        # MS/TP allows up to maxinfo frames outstanding per token pass
+        self.max_inflight = max(1, int(max_inflight))
+
+        # cycle counter so a late ACK cannot corrupt the next cycle
+        self._cycle = 0
+
+        # the first cycle reads everything, nameplate fields included
+        self._cycle_requests = GS4_all_requests
+        self._last_slow_poll = None
         
         # install the task
         self.install_task()
-        if _debug: PrairieDog._debug("    - install_task")
+        _dbg("    - install_task")
 
     def process_task(self):
-        if _debug: PrairieDog._debug("process_task")
+        _dbg("process_task")
 
-        # check to see if task is idle
-        if self.is_busy():
+        # check to see if the previous cycle is still running
+        if self._busy_mask:
+            self.missed_ticks += 1
+            _dbg("    - missed ticks: %r", self.missed_ticks)
             return
 
-        # now we are busy
-        self.GS4_busy = True
-        #self.arduino1_busy = True
+        # broker unreachable past the maximum backoff, decided here so
+        # it never runs on paho's callback thread
+        if mqtt_disconnect_time is not None and \
+                time.monotonic() - mqtt_disconnect_time > mqtt_max_reconnect_delay:
+            _dbg("    - mqtt unreachable past max backoff, fallback to LoRa")
+            # TODO: spawn LoRa backup comm here
 
-        # turn the point list into a queue
-        self.point_queue = deque(GS4_point_list)
-        if _debug: PrairieDog._debug("    - deque point list %r", self.point_queue)
-
-        # clear out response value list
-        self.response_values = []
-
-        # read next GS4 data
-        self.next_GS4_request()
+        # now we are busy
+        self._busy_mask |= GS4_BIT
+
+        # fast points go out every cycle, nameplate fields only once
+        # they are stale, their cached values carry over in between
+        now = time.monotonic()
+        if self._last_slow_poll is None or \
+                now - self._last_slow_poll >= GS4_slow_interval:
+            self._cycle_requests = GS4_all_requests
+            self._last_slow_poll = now
+        else:
+            self._cycle_requests = GS4_fast_requests
+
+        # blank only the slots this cycle re-reads
+        response_values = self.response_values
+        for addr, device_keys, request in self._cycle_requests:
+            for point_key in device_keys:
+                response_values[GS4_point_index[point_key]] = None
+
+        # start a new cycle
+        self._cycle += 1
+
+        # submit up to max_inflight prebuilt device requests so the
+        # transactions run concurrently, the callback tops the window
+        # back up and counts the responses in
+        self._pending = len(self._cycle_requests)
+        self._submit_index = 0
+        for _ in range(min(self.max_inflight, self._pending)):
+            self.submit_next_request()
+
+        # in fire-and-forget mode the cycle is done as far as scheduling
+        # is concerned, the light callback still records late values
+        if self.fire_and_forget:
+            self._busy_mask &= ~GS4_BIT
 
         # read next Arduino sensor outputs
         # TODO self.next_arduino_request()
 
-    def next_GS4_request(self):
-        if _debug: PrairieDog._debug("next_GS4_request")
-
-        # check to see if the point queue is empty
-        if not self.point_queue:
-            # if so, complete GS4 read
-            self.read_GS4_complete()
+    def submit_next_request(self):
+        _dbg("submit_next_request")
 
+        # check to see if any device requests remain this cycle
+        if self._submit_index >= len(self._cycle_requests):
             return
 
-        # get the next GS4 reuest
-        addr, obj_id, prop_id = self.point_queue.popleft()
-        obj_id = ObjectIdentifier(obj_id).value
-
-        datatype = get_datatype(obj_id[0], prop_id)
-        if not datatype:
-            raise ValueError("invalid property for object type")
-
-        # build a request
-        request = ReadPropertyRequest(
-            objectIdentifier=obj_id,
-            propertyIdentifier=prop_id,
-            )
-        request.pduDestination = Address(addr)
-        if _debug: PrairieDog._debug("    - request: %r", request)
+        # get the next prebuilt device request
+        addr, device_keys, request = self._cycle_requests[self._submit_index]
+        self._submit_index += 1
 
         # make an IOCB
         iocb = IOCB(request)
-        if _debug: PrairieDog._debug("    - iocb: %r", iocb)
+        _dbg("    - iocb: %r", iocb)
+
+        # tag it so late or stale responses can be correlated
+        iocb.gs4_addr = addr
+        iocb.gs4_points = device_keys
+        iocb.cycle_id = self._cycle
+
+        # give up on the transaction well before the next tick
+        iocb.set_timeout(self.interval * 0.8, err=TimeoutError)
 
         # set a callback for the request
         iocb.add_callback(self.GS4_request_callback)
-        if _debug: PrairieDog._debug("    - GS4 request callback set")
 
         # give the iocb to the application
         self.request_io(iocb)
 
     def GS4_request_callback(self, iocb):
-        if _debug: PrairieDog._debug("GS4_request_callback %r", iocb)
+        _dbg("GS4_request_callback %r", iocb)
 
-        # do something for error/reject/abort
+        # discard responses that straggled in from an earlier cycle
+        if iocb.cycle_id != self._cycle:
+            _dbg("    - stale cycle %r, discarded", iocb.cycle_id)
+            return
+        addr = iocb.gs4_addr
+
+        # do something for error/reject/abort/timeout
         if iocb.ioError:
-            sys.stdout.write(str(iocb.ioError) + '\n')
-            if _debug: PrairieDog._debug("    - error: %r", iocb.ioError)
-            self.response_values.append(iocb.ioError)
+            _dbg("    - error: %r", iocb.ioError)
+            if _debug: self._debug_buf.append(str(iocb.ioError))
+
+            # every point covered by the request gets the error
+            for point_key in iocb.gs4_points:
+                self.response_values[GS4_point_index[point_key]] = iocb.ioError
 
         # iocb successful
         elif iocb.ioResponse:
             apdu = iocb.ioResponse
 
             # should be an ack
-            if not isinstance(apdu, ReadPropertyACK):
-                if _debug: PrairieDog._debug("    - not an ack")
+            if not isinstance(apdu, ReadPropertyMultipleACK):
+                _dbg("    - not an ack")
                 stop()
+                return
 
-            # find the datatype
-            datatype = get_datatype(apdu.objectIdentifier[0], apdu.propertyIdentifier)
-            if _debug: PrairieDog._debug("    - datatype: %r", datatype)
-            if not datatype:
-                raise TypeError("unknown datatype")
-
-            # special case for array parts, others are managed by cast_out
-            if issubclass(datatype, Array) and (apdu.propertyArrayIndex is not None):
-                if apdu.propertyArrayIndex == 0:
-                    value = apdu.propertyValue.cast_out(Unsigned)
-                else:
-                    value = apdu.propertyValue.cast_out(datatype.subtype)
-            else:
-                value = apdu.propertyValue.cast_out(datatype)
-            if _debug: PrairieDog._debug("    - value: %r", value)
-
-            # write each value to stdout as it is received for debugging
-            #sys.stdout.write(str(value) + '\n')
-            #if hasattr(value, 'debug_contents'):
-                #value.debug_contents(file=sys.stdout)
-            #sys.stdout.flush()
-
-            # save the value
-            self.response_values.append(value)
+            # localize the names used in the tight decode loop
+            response_values = self.response_values
+            point_index = GS4_point_index
+            datatypes = GS4_datatypes
+            debug_buf = self._debug_buf
+
+            # walk the results for each object on the device
+            for result in apdu.listOfReadAccessResults:
+                obj_id = result.objectIdentifier
+                _dbg("    - objectIdentifier: %r", obj_id)
+
+                for element in result.listOfResults:
+                    prop_id = element.propertyIdentifier
+                    prop_array_index = element.propertyArrayIndex
+                    read_result = element.readResult
+
+                    # a property may come back as an error instead of a value
+                    if read_result.propertyAccessError is not None:
+                        _dbg("    - error: %r", read_result.propertyAccessError)
+                        response_values[point_index[(addr, obj_id, prop_id)]] = read_result.propertyAccessError
+                        continue
+
+                    # find the datatype, resolved once at import
+                    datatype = datatypes.get((obj_id[0], prop_id))
+                    _dbg("    - datatype: %r", datatype)
+                    if not datatype:
+                        raise TypeError("unknown datatype")
+
+                    # special case for array parts, others are managed by cast_out
+                    if issubclass(datatype, Array) and (prop_array_index is not None):
+                        if prop_array_index == 0:
+                            value = read_result.propertyValue.cast_out(Unsigned)
+                        else:
+                            value = read_result.propertyValue.cast_out(datatype.subtype)
+                    else:
+                        value = read_result.propertyValue.cast_out(datatype)
+                    _dbg("    - value: %r", value)
+
+                    # buffer each value for debugging, flushed once per cycle
+                    if _debug: debug_buf.append(str(value))
+
+                    # save the value
+                    response_values[point_index[(addr, obj_id, prop_id)]] = value
 
         # no ioError or ioResponse
         else:
-            if _debug: PrairieDog._debug._debug("    - GS4 ioError or ioResponse expected")
+            _dbg("    - GS4 ioError or ioResponse expected")
+
+        # top the submission window back up
+        if self._submit_index < len(self._cycle_requests):
+            deferred(self.submit_next_request)
 
-        # queue the next GS4 request
-        deferred(self.next_GS4_request)
+        # when every device has answered, finish the cycle
+        self._pending -= 1
+        if self._pending == 0:
+            deferred(self.read_GS4_complete)
 
     def read_GS4_complete(self):
-        global mqtt_connected
-        if _debug: PrairieDog._debug("read_GS4_complete")
+        _dbg("read_GS4_complete")
 
         # dump out the request and results to screen for debug
         #for request, response in zip(GS4_point_list, self.response_values):
         #    print(request, response)
 
-        # Publish results to JGCB mqtt topic
-        idx = 0
-        for topic in mqtt_JGCB_topics:
-            if mqtt_connected == True:
-                self.mqtt_client.publish(self.response_values[idx])
-                self.mqtt_client.publish(self.response_values[idx+1])
-                self.mqtt_client.publish(self.response_values[idx+2])
-                self.mqtt_client.publish(self.response_values[idx+3])
-
-            print(self.response_values[idx], self.response_values[idx+1]), print(self.response_values[idx+2], self.response_values[idx+3])
-            idx+=4
+        # flush the buffered per-point debug output in a single write
+        if _debug and self._debug_buf:
+            sys.stdout.write('\n'.join(self._debug_buf) + '\n')
+            sys.stdout.flush()
+            self._debug_buf.clear()
+
+        # after a minute with no live broker stop building payloads,
+        # nothing is draining and the readings are still in the buffer
+        if self.mqtt_connected.is_set():
+            self._last_publish_ok = time.monotonic()
+        elif time.monotonic() - self._last_publish_ok > 60:
+            _dbg("    - mqtt stalled, skipping publish work")
+            self._busy_mask &= ~GS4_BIT
+            return
+
+        # the response buffer is already in point-list order, a point
+        # that never answered is still None in its slot
+        values = self.response_values
+
+        # Publish one structured payload per topic so the broker sees a
+        # single PUBLISH per parameter, not one per point value
+        for topic, idx in self._topic_offsets:
+            if self.mqtt_connected.is_set():
+                payload = _dumps({
+                    "name": _encode(values[idx]),
+                    "value": _encode(values[idx+1]),
+                    "units": _encode(values[idx+2]),
+                    "flags": _encode(values[idx+3]),
+                    })
+                self.mqtt_client.publish(topic, payload, qos=0, retain=True)
+
+            if _debug: print(*values[idx:idx+4])
         # GS4 requests processed
-        self.GS4_busy = False
+        self._busy_mask &= ~GS4_BIT
 
     def read_arduino1_complete(self):
-        if _debug: PrairieDog._debug("read_arduino1_complete")
+        _dbg("read_arduino1_complete")
 
         # Publish results to JGCB mqtt topic
 
         # Arduino requests processed
-        self.arduino1_busy = False
-
-    def is_busy(self):
-
-        # check status of each thread
-        if self.GS4_busy:
-            if _debug: PrairieDog._debug("is busy")
-            return True
-        elif self.arduino1_busy:
-            if _debug: PrairieDog._debug("is busy")
-            return True
-        else:
-            if _debug: PrairieDog._debug("is not busy")
-            return False
+        self._busy_mask &= ~ARDUINO1_BIT
 
 def mqtt_init(id, topic):
-    global mqtt_connected
     if _debug: _log.debug("mqtt_init")
 
-    client = None
-
     def on_mqtt_connect(client, userdata, flags, rc):
+        global mqtt_disconnect_time
         if rc == 0:
             # success
             if _debug: _log.debug("    - mqtt client %r connected to broker with result code %r", client, rc)
-            mqtt_connected = True
+            _mqtt_connected.set()
+            mqtt_disconnect_time = None
             for topic in mqtt_JGCB_topics:
                 client.subscribe(topic)
+                # advertise the payload encoding for subscribers
+                client.publish(topic + "/encoding", payload_encoding, qos=0, retain=True)
             # syslog
         else:
             if _debug: _log.debug("    - mqtt client failed to connect with result code %r", rc)
             # syslog
 
     def on_mqtt_disconnect(client, userdata, rc):
+        global mqtt_disconnect_time
         if _debug: _log.debug("    - mqtt client %r disconnected with result code %r", client, rc)
-        mqtt_connected = False
+        _mqtt_connected.clear()
+        if mqtt_disconnect_time is None:
+            mqtt_disconnect_time = time.monotonic()
         # syslog
-        
-        reconnect_delay = mqtt_first_reconnect_delay
-        while True:
-            if _debug: _log.debug("    - try mqtt reconnect in %r seconds", reconnect_delay)
-            time.sleep(reconnect_delay)
-
-            try:
-                client.reconnect()
-                if _debug: _log.debug("    - mqtt client reconnected successfully")
-                mqtt_connected = True
-                # syslog
-                return
-            except Exception as err:
-                if _debug: _log.debug("    - mqtt client reconnect failed with err %r.  Retrying...", err)
-                # syslog
-                if reconnect_delay == mqtt_max_reconnect_delay:
-                    if _debug: _log.debug("    - max mqtt retry delay reached, fallback to LoRa")
-                    # TODO: spawn LoRa backup comm here
 
-            reconnect_delay *= mqtt_reconnect_rate
-            reconnect_delay = min(reconnect_delay, mqtt_max_reconnect_delay)
+        # reconnection is handled by paho's network thread with the
+        # backoff set by reconnect_delay_set below, never sleep here,
+        # the recurring task watches mqtt_disconnect_time for the
+        # LoRa fallback
 
     def on_mqtt_message(client, userdata, msg):
         if _debug: _log.debug("mqtt client %r received unsupported message", client)
         # default message client
         # do nothing
 
-    while client == None:
-        try:
-            client = mqtt.Client()
-            if _debug: _log.debug("    - mqtt client created")
-            #simple security with username/pw; for better security use SSL/TLS certs
-            #client.username_pw_set(username, password)
-            client.on_connect = on_mqtt_connect
-            client.on_disconnect = on_mqtt_disconnect
-            client.on_message = on_mqtt_message
-
-        except Exception as str_error:
-            if _debug: _log.debug("    - couldn't create mqtt client")
-            time.sleep(10)
-            #syslog?
+    def on_mqtt_socket_open(client, userdata, sock):
+        if _debug: _log.debug("    - mqtt socket opened %r", sock)
+        # disable Nagle so the small qos 0 publishes leave immediately
+        # instead of coalescing behind a delayed ACK
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+    # constructing a client does no I/O, so there is nothing to retry
+    client = mqtt.Client(client_id=str(id), clean_session=True)
+    if _debug: _log.debug("    - mqtt client created")
+    #simple security with username/pw; for better security use SSL/TLS certs
+    #client.username_pw_set(username, password)
+    client.on_connect = on_mqtt_connect
+    client.on_disconnect = on_mqtt_disconnect
+    client.on_message = on_mqtt_message
+    client.on_socket_open = on_mqtt_socket_open
+
+    # let paho back off between reconnect attempts on its own
+    client.reconnect_delay_set(
+        min_delay=mqtt_first_reconnect_delay,
+        max_delay=mqtt_max_reconnect_delay)
+
+    # keep qos 0 sends pipelined and the outbound queue bounded so a
+    # dead broker can never grow memory without limit
+    client.max_inflight_messages_set(20)
+    client.max_queued_messages_set(100)
 
     return client
 
-def on_stuff_msg_callback():
+def on_stuff_msg_callback(client, userdata, msg):
     if _debug: _log.debug("mqtt callback for message received on stuff topic")
     # do stuff if we get a do stuff message
 
@@ -308,51 +582,52 @@ def on_stuff_msg_callback():
 #
 
 def main():
+    global _dbg
+
     this_application = None
     mqtt_JGCB_client = None
 
     # parse the command line arguments
     args = ConfigArgumentParser(description=__doc__).parse_args()
 
+    # debugging is settled now, bind the real debug function once
+    if _debug:
+        _dbg = PrairieDog._debug
+
     if _debug: _log.debug("initialization")
     if _debug: _log.debug("    - args: %r", args)
 
     # make an MSTP device object
-    mstp_args = {
-        '_address': int(args.ini.address),
-        '_interface':str(args.ini.interface),
-        '_max_masters': int(args.ini.max_masters),
-        '_baudrate': int(args.ini.baudrate),
-        '_maxinfo': int(args.ini.maxinfo),
-    }
-
-    if hasattr(args.ini, 'mstpdbgfile'):
-       mstp_args['_mstpdbgfile'] = str(args.ini.mstpdbgfile)
+    mstp_cfg = MSTPArgs.from_ini(args.ini)
+    if _debug: _log.debug("    - mstp_cfg: %r", mstp_cfg)
 
     # create local deice object
-    this_device = LocalDeviceObject(ini=args.ini, **mstp_args)
+    this_device = LocalDeviceObject(ini=args.ini, **mstp_cfg.device_kwargs())
     if _debug: _log.debug("    - this_device: %r", this_device)
 
     # create mqtt client
     JGCB_mqtt_client = mqtt_init(JGCB_mqtt_ID, mqtt_JGCB_topics)
 
     # make recurring MSTP BACnet applications
-    this_application = PrairieDog(JGCB_interval, JGCB_mqtt_client, this_device, args.ini.address)
+    this_application = PrairieDog(GS4_fast_interval, JGCB_mqtt_client, this_device, args.ini.address,
+                                  max_inflight=mstp_cfg.maxinfo)
     if _debug: _log.debug("    - this_application: %r", this_application)
 
-    #JGCB_mqtt_client.connect(mqtt_broker_address, mqtt_broker_port, mqtt_keep_alive_time)
-    #if _debug: _log.debug("    - JGCB mqtt client connect commang issued")
+    # non-blocking connect, paho's network thread completes the TCP
+    # handshake and retries so bacpypes startup is never held up
+    JGCB_mqtt_client.connect_async(mqtt_broker_address, mqtt_broker_port, mqtt_keep_alive_time)
+    if _debug: _log.debug("    - JGCB mqtt client connect_async issued")
     
-    #JGCB_mqtt_client.message_callback_add(mqtt_JGCB_topic, on_stuff_msg_callback)
-    #JGCB_mqtt_client.loop_start()
-    #if _debug: _log.debug("    - JGCB mqtt client loop started")
+    #JGCB_mqtt_client.message_callback_add(mqtt_JGCB_topics[0], on_stuff_msg_callback)
+    JGCB_mqtt_client.loop_start()
+    if _debug: _log.debug("    - JGCB mqtt client loop started")
     
     _log.debug("running")
 
     run()
     
     # clean up
-    #JGCB_mqtt_client.loop_stop()
+    JGCB_mqtt_client.loop_stop()
     
     _log.debug("fini")
 
@@ -31,6 +31,32 @@ GS4_point_list = [
     (99, 'analogValue:11', 'units'),
     (99, 'analogValue:11', 'statusFlags'),
     ]
-# JGCB polling interval (sec)
-# Current framework polls all sources at the same rate
+# Fast/slow split of the point list (must partition GS4_point_list above)
+# Live values are re-read every fast interval; nameplate fields like
+# objectName/units essentially never change, so they are refreshed on the
+# slow interval and the last-seen values are reused in between
+GS4_fast_point_list = [
+    (99, 'analogValue:31', 'presentValue'),
+    (99, 'analogValue:31', 'statusFlags'),
+    (99, 'analogValue:11', 'presentValue'),
+    (99, 'analogValue:11', 'statusFlags'),
+    ]
+GS4_slow_point_list = [
+    (99, 'analogValue:31', 'objectName'),
+    (99, 'analogValue:31', 'units'),
+    (99, 'analogValue:11', 'objectName'),
+    (99, 'analogValue:11', 'units'),
+    ]
+# GS4 polling intervals (sec)
+GS4_fast_interval = 5
+GS4_slow_interval = 300
+
+# Fire-and-forget polling: clear the busy flag right after the requests
+# are submitted instead of waiting for every ACK, so the next tick is
+# never held up by a slow or silent drive.  Values are still recorded
+# and published as the ACKs arrive.
+GS4_fire_and_forget = False
+
+# JGCB polling interval (sec) for the remaining sources (Arduino, Pi)
+# GS4 polling uses the fast/slow intervals above
 JGCB_interval = 5
\ No newline at end of file